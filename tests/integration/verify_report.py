@@ -1,119 +1,432 @@
 #!/usr/bin/env python3
 """Validate melisai JSON report structure.
 
-Usage: python3 verify_report.py /path/to/report.json
-Exit 0 = valid, exit 1 = invalid (prints errors to stderr).
+Usage: python3 verify_report.py [--verbose] [--stream] [--from-stdin] /path/to/report.json...
+Exit 0 = all reports valid, exit 1 = any invalid (prints errors to stderr).
 """
 
+import argparse
 import json
+import os
 import sys
 
+try:
+    import orjson
+except ImportError:  # distro containers ship bare python3
+    orjson = None
 
-def fail(msg):
-    print(f"FAIL: {msg}", file=sys.stderr)
+
+def load_json(f):
+    """Parse a report from a binary file object, preferring orjson."""
+    if orjson is not None:
+        return orjson.loads(f.read())
+    return json.load(f)
+
+
+def fail(fmt, *args):
+    """Print a failure; fmt is %-formatted with args only when called."""
+    print(f"FAIL: {fmt % args}", file=sys.stderr)
     return False
 
 
-def validate(report):
-    ok = True
+TOP_LEVEL_KEYS = ("metadata", "categories", "summary")
+REQUIRED_CATEGORIES = {"cpu", "memory", "process"}
+
+# The check_* functions below are the authoritative rules. REPORT_SCHEMA is
+# a compiled fast path for the default mode and must accept exactly the
+# reports they accept. Draft-04 is used because its "integer" rejects 12.0.
+REPORT_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "type": "object",
+    "required": ["metadata", "categories", "summary"],
+    "properties": {
+        "metadata": {
+            "type": "object",
+            "required": ["tool"],
+            "properties": {
+                "tool": {"enum": ["melisai"]},
+                "observer_overhead": {
+                    "type": ["object", "null"],
+                    "required": ["self_pid"],
+                    "properties": {
+                        "self_pid": {"type": "integer", "minimum": 1},
+                    },
+                },
+            },
+        },
+        "categories": {
+            "type": "object",
+            "required": ["cpu", "memory", "process"],
+            "additionalProperties": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ["collector", "category", "tier"],
+                    "properties": {
+                        "tier": {"enum": [1, 2, 3]},
+                    },
+                },
+            },
+        },
+        "summary": {
+            "type": "object",
+            "required": ["health_score"],
+            "properties": {
+                "health_score": {"type": "integer", "minimum": 0, "maximum": 100},
+            },
+        },
+    },
+}
+
+try:
+    import fastjsonschema
+    schema_validator = fastjsonschema.compile(REPORT_SCHEMA)
+except ImportError:
+    fastjsonschema = None
+    schema_validator = None
 
-    # Top-level keys
-    for key in ("metadata", "categories", "summary"):
-        if key not in report:
-            ok = fail(f"missing top-level key: {key}") and False
+try:
+    import ijson
+    # json.JSONDecodeError and orjson.JSONDecodeError are ValueErrors
+    JSON_ERRORS = (ValueError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_ERRORS = (ValueError,)
 
-    if not ok:
+
+def is_error_only(r):
+    """True if a result has errors but no data/histograms/events/stacks."""
+    rget = r.get
+    if not rget("errors"):
         return False
+    return not (rget("data") or rget("histograms") or rget("events") or rget("stacks"))
 
-    # --- Metadata ---
-    meta = report["metadata"]
-    if meta.get("tool") != "melisai":
-        ok = fail(f"metadata.tool = {meta.get('tool')!r}, expected 'melisai'") and False
 
-    overhead = meta.get("observer_overhead")
-    if overhead is not None:
-        if not isinstance(overhead.get("self_pid"), int) or overhead["self_pid"] <= 0:
-            ok = fail(f"observer_overhead.self_pid invalid: {overhead.get('self_pid')}") and False
+def warn_error_only(error_only_collectors):
+    # Warn about error-only collectors but don't fail (some tools legitimately have no data)
+    if error_only_collectors:
+        print(f"WARNING: {len(error_only_collectors)} error-only collectors: "
+              f"{', '.join(map(str, error_only_collectors[:5]))}"
+              f"{'...' if len(error_only_collectors) > 5 else ''}", file=sys.stderr)
 
-    # --- Categories ---
-    cats = report["categories"]
-    if not isinstance(cats, dict):
-        return fail("categories is not an object")
 
-    required_cats = {"cpu", "memory", "process"}
-    missing = required_cats - set(cats.keys())
-    if missing:
-        ok = fail(f"missing categories: {missing}") and False
+def validate(report, fast_fail=True):
+    """Validate a parsed report.
+
+    fast_fail stops at the first structural violation. With fast_fail=False
+    the hand-rolled checks run even when fastjsonschema is available, so that
+    every violation gets reported.
+    """
+    if schema_validator is not None and fast_fail:
+        try:
+            schema_validator(report)
+        except fastjsonschema.JsonSchemaException as e:
+            return fail("%s", e.message)
+    elif not validate_structure(report, fast_fail):
+        return False
 
-    # Validate each result
     total_results = 0
     error_only_collectors = []
-    for cat_name, results in cats.items():
-        if not isinstance(results, list):
-            ok = fail(f"categories.{cat_name} is not an array") and False
+    for results in report["categories"].values():
+        total_results += len(results)
+        error_only_collectors.extend(r["collector"] for r in results if is_error_only(r))
+
+    ok = check_has_results(total_results)
+    warn_error_only(error_only_collectors)
+    return ok
+
+
+def build_value(events, event, value):
+    """Assemble the JSON value starting at (event, value) from ijson events."""
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1 if event in ("start_map", "start_array") else 0
+    while depth:
+        _, event, value = next(events)
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+    return builder.value
+
+
+def validate_stream(f, fast_fail=True):
+    """Validate a report from a binary file object without loading it whole.
+
+    The file is parsed once. metadata and summary are built fully (they are
+    small); collector results are built and checked one at a time, so peak
+    memory is bounded by the largest single result. Returns (ok, number of
+    categories).
+    """
+    events = ijson.parse(f)
+    if next(events)[1] != "start_map":
+        return fail("report is not an object"), 0
+
+    ok = True
+    seen_keys = set()
+    summary = None
+    seen_cats = set()
+    total_results = 0
+    error_only_collectors = []
+
+    for prefix, event, value in events:
+        if prefix != "" or event != "map_key":
             continue
-        for i, r in enumerate(results):
-            total_results += 1
-            collector = r.get("collector", f"unknown[{i}]")
-
-            if "collector" not in r:
-                ok = fail(f"categories.{cat_name}[{i}]: missing 'collector'") and False
-            if "category" not in r:
-                ok = fail(f"{collector}: missing 'category'") and False
-            if "tier" not in r:
-                ok = fail(f"{collector}: missing 'tier'") and False
-            elif r["tier"] not in (1, 2, 3):
-                ok = fail(f"{collector}: tier={r['tier']}, expected 1/2/3") and False
-
-            # Check for error-only collectors (has errors but no data/histograms/events)
-            has_errors = bool(r.get("errors"))
-            has_data = r.get("data") is not None and r.get("data") != {}
-            has_histograms = bool(r.get("histograms"))
-            has_events = bool(r.get("events"))
-            has_stacks = bool(r.get("stacks"))
-            if has_errors and not (has_data or has_histograms or has_events or has_stacks):
-                error_only_collectors.append(collector)
+        key = value
+        seen_keys.add(key)
+        _, event, value = next(events)
+
+        if key == "metadata":
+            if not check_metadata(build_value(events, event, value), fast_fail):
+                ok = False
+                if fast_fail:
+                    return False, 0
+        elif key == "summary":
+            summary = build_value(events, event, value)
+        elif key == "categories":
+            if event != "start_map":
+                return fail("categories is not an object"), 0
+            for _, event, cat_name in events:
+                if event == "end_map":
+                    break
+                seen_cats.add(cat_name)
+                _, event, value = next(events)
+                if event != "start_array":
+                    build_value(events, event, value)
+                    ok = fail("categories.%s is not an array", cat_name)
+                    if fast_fail:
+                        return False, 0
+                    continue
+                i = 0
+                for _, event, value in events:
+                    if event == "end_array":
+                        break
+                    r = build_value(events, event, value)
+                    if not check_result(cat_name, i, r):
+                        ok = False
+                        if fast_fail:
+                            return False, 0
+                    elif is_error_only(r):
+                        error_only_collectors.append(r["collector"])
+                    i += 1
+                total_results += i
+
+    ok = check_sections(ok, seen_keys, seen_cats, summary, fast_fail)
+    if ok:
+        ok = check_has_results(total_results)
+        warn_error_only(error_only_collectors)
+    return ok, len(seen_cats)
+
+
+def validate_structure(report, fast_fail=True):
+    """Hand-rolled equivalent of REPORT_SCHEMA, used without fastjsonschema.
+
+    Walks the sections in the same order as validate_stream() and finishes
+    with the same check_sections() call, so both report identically.
+    """
+    if not isinstance(report, dict):
+        return fail("report is not an object")
+
+    ok = True
+    if "metadata" in report and not check_metadata(report["metadata"], fast_fail):
+        ok = False
+        if fast_fail:
+            return False
+
+    cats = report.get("categories", {})
+    if not isinstance(cats, dict):
+        return fail("categories is not an object")
+
+    for cat_name, results in cats.items():
+        if not check_results(cat_name, results, fast_fail):
+            ok = False
+            if fast_fail:
+                return False
+
+    return check_sections(ok, report.keys(), cats.keys(), report.get("summary"), fast_fail)
+
+
+def check_sections(ok, keys, cat_names, summary, fast_fail=True):
+    """Checks that need every top-level section to have been seen.
 
+    Shared by validate_structure() and validate_stream(); ok carries the
+    verdict of the per-section checks that ran before.
+    """
+    missing_keys = [key for key in TOP_LEVEL_KEYS if key not in keys]
+    if missing_keys:
+        for key in missing_keys[:1] if fast_fail else missing_keys:
+            fail("missing top-level key: %s", key)
+        return False
+
+    if not check_required_categories(cat_names):
+        ok = False
+        if fast_fail:
+            return False
+
+    if not check_summary(summary):
+        ok = False
+
+    return ok
+
+
+def check_has_results(total_results):
     if total_results == 0:
-        ok = fail("no results in any category") and False
+        return fail("no results in any category")
+    return True
 
-    # Warn about error-only collectors but don't fail (some tools legitimately have no data)
-    if error_only_collectors:
-        print(f"WARNING: {len(error_only_collectors)} error-only collectors: "
-              f"{', '.join(error_only_collectors[:5])}"
-              f"{'...' if len(error_only_collectors) > 5 else ''}", file=sys.stderr)
 
-    # --- Summary ---
-    summary = report["summary"]
-    hs = summary.get("health_score")
-    if not isinstance(hs, int) or hs < 0 or hs > 100:
-        ok = fail(f"summary.health_score invalid: {hs!r}") and False
+def is_json_int(x):
+    """JSON integer: excludes floats and bools (bool subclasses int)."""
+    return isinstance(x, int) and not isinstance(x, bool)
+
+
+def check_metadata(meta, fast_fail=True):
+    if not isinstance(meta, dict):
+        return fail("metadata is not an object")
+
+    ok = True
+    if meta.get("tool") != "melisai":
+        ok = False
+        fail("metadata.tool = %r, expected 'melisai'", meta.get("tool"))
+        if fast_fail:
+            return False
+
+    overhead = meta.get("observer_overhead")
+    if overhead is None:
+        return ok
+    if not isinstance(overhead, dict):
+        return fail("metadata.observer_overhead is not an object")
+
+    self_pid = overhead.get("self_pid")
+    if not is_json_int(self_pid) or self_pid <= 0:
+        ok = False
+        fail("observer_overhead.self_pid invalid: %s", self_pid)
 
     return ok
 
 
-def main():
-    if len(sys.argv) != 2:
-        print(f"Usage: {sys.argv[0]} <report.json>", file=sys.stderr)
-        sys.exit(2)
+def check_required_categories(cat_names):
+    missing = REQUIRED_CATEGORIES - set(cat_names)
+    if missing:
+        return fail("missing categories: %s", missing)
+    return True
+
 
-    path = sys.argv[1]
+def check_results(cat_name, results, fast_fail=True):
+    """Validate the result array of one category."""
+    if not isinstance(results, list):
+        return fail("categories.%s is not an array", cat_name)
+
+    ok = True
+    for i, r in enumerate(results):
+        if not check_result(cat_name, i, r):
+            ok = False
+            if fast_fail:
+                return False
+
+    return ok
+
+
+def check_result(cat_name, i, r):
+    """Validate one collector result; reports every problem it has."""
+    if not isinstance(r, dict):
+        return fail("categories.%s[%d] is not an object", cat_name, i)
+
+    ok = True
+    if "collector" in r:
+        collector = r["collector"]
+    else:
+        ok = False
+        fail("categories.%s[%d]: missing 'collector'", cat_name, i)
+        collector = f"unknown[{i}]"
+    if "category" not in r:
+        ok = False
+        fail("%s: missing 'category'", collector)
+    if "tier" not in r:
+        ok = False
+        fail("%s: missing 'tier'", collector)
+    elif isinstance(r["tier"], bool) or r["tier"] not in (1, 2, 3):
+        ok = False
+        fail("%s: tier=%s, expected 1/2/3", collector, r["tier"])
+
+    return ok
+
+
+def check_summary(summary):
+    if not isinstance(summary, dict):
+        return fail("summary is not an object")
+    hs = summary.get("health_score")
+    if not is_json_int(hs) or hs < 0 or hs > 100:
+        return fail("summary.health_score invalid: %r", hs)
+    return True
+
+
+def verify_file(path, stream=False, fast_fail=True):
+    """Load and validate one report file; returns (ok, detail).
+
+    Unreadable or unparsable files are reported as failures of this file,
+    so a batch run carries on with the next path.
+    """
     try:
-        with open(path) as f:
-            report = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"FAIL: invalid JSON: {e}", file=sys.stderr)
-        sys.exit(1)
+        with open(path, "rb") as f:
+            if stream:
+                ok, n_categories = validate_stream(f, fast_fail)
+            else:
+                report = load_json(f)
+                ok = validate(report, fast_fail)
+                n_categories = len(report["categories"]) if ok else 0
+        if not ok:
+            return False, None
+    except JSON_ERRORS as e:
+        return fail("%s: invalid JSON: %s", path, e), None
     except FileNotFoundError:
-        print(f"FAIL: file not found: {path}", file=sys.stderr)
-        sys.exit(1)
+        return fail("%s: file not found", path), None
+    except OSError as e:
+        return fail("%s: cannot read report: %s", path, e.strerror or e), None
+    return True, f"{n_categories} categories"
 
-    if validate(report):
-        print(f"OK: report valid ({len(report.get('categories', {}))} categories)")
-        sys.exit(0)
-    else:
-        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate melisai JSON report structure.")
+    parser.add_argument("reports", nargs="*", metavar="report", help="path to report.json")
+    parser.add_argument("--from-stdin", action="store_true",
+                        help="also read newline-separated report paths from stdin")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="report every violation instead of stopping at the first")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse incrementally with ijson to bound memory on large reports")
+    args = parser.parse_args()
+
+    paths = list(args.reports)
+    if args.from_stdin:
+        paths.extend(line.strip() for line in sys.stdin if line.strip())
+    if not paths:
+        parser.error("no reports given")
+
+    if args.stream and ijson is None:
+        print("FAIL: --stream requires the ijson package", file=sys.stderr)
+        return 2
+
+    # Several reports share one interpreter (and one compiled schema); tag
+    # each verdict with its path so the output stays readable.
+    batch = len(paths) > 1
+    all_ok = True
+    for path in paths:
+        ok, detail = verify_file(path, args.stream, not args.verbose)
+        if ok:
+            print(f"OK: {path}: report valid ({detail})" if batch else f"OK: report valid ({detail})")
+        else:
+            all_ok = False
+            if batch:
+                print(f"FAIL: {path}: report invalid", file=sys.stderr)
+    return 0 if all_ok else 1
 
 
 if __name__ == "__main__":
-    main()
+    code = main()
+    # Skip interpreter teardown (atexit handlers, final GC): these scripts
+    # run once per report in CI and exit right after printing.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
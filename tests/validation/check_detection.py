@@ -13,35 +13,100 @@ import json
 import sys
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SEVERITY_RANK = {"info": 0, "warning": 1, "critical": 2, "error": 3}
+# min_severity argument of has_anomaly -> rank; None/"" mean any severity
+MIN_SEVERITY_RANK = {None: 0, "": 0, **SEVERITY_RANK}
+
 
 def load_report(path):
-    with open(path) as f:
+    with open(path, "rb") as f:
+        if orjson is not None:
+            return orjson.loads(f.read())
         return json.load(f)
 
 
+def index_report(report, describe=False):
+    """Build anomaly/recommendation lookup tables once, stored in report["_idx"].
+
+    With describe=True the same pass also renders the summary lines main()
+    prints, under "anomaly_lines" and "rec_lines".
+    """
+    summary = report.get("summary") or {}
+    anomalies = summary.get("anomalies") or []
+    recs = summary.get("recommendations") or []
+    by_metric = {}
+    max_rank = {}  # metric -> highest severity rank seen, answers has_anomaly
+    cats = set()
+    anomaly_lines = []
+    for a in anomalies:
+        metric = a.get("metric")
+        by_metric.setdefault(metric, []).append(a)
+        rank = SEVERITY_RANK.get(a.get("severity", ""), 0)
+        if rank > max_rank.get(metric, -1):
+            max_rank[metric] = rank
+        cats.add(a.get("category"))
+        if describe:
+            anomaly_lines.append(
+                f"    [{a.get('severity', '?').upper():8s}] {a.get('metric', '?')}: "
+                f"{a.get('message', '')} (value={a.get('value', '?')})")
+    # (title, evidence) lowercased for has_recommendation
+    recs_lc = []
+    rec_lines = []
+    for r in recs:
+        recs_lc.append((r.get("title", "").lower(), r.get("evidence", "").lower()))
+        if describe:
+            rec_lines.append(f"    [{r.get('priority', '?')}] {r.get('title', '?')}")
+    idx = {
+        "summary": summary,
+        "categories": report.get("categories") or {},
+        "metadata": report.get("metadata") or {},
+        "anomalies": anomalies,
+        "recommendations": recs,
+        "by_metric": by_metric,
+        "max_rank": max_rank,
+        "warn_metrics": {m for m, rank in max_rank.items() if rank >= SEVERITY_RANK["warning"]},
+        "cats": cats,
+        "recs_lc": recs_lc,
+        "anomaly_lines": anomaly_lines,
+        "rec_lines": rec_lines,
+    }
+    report["_idx"] = idx
+    return idx
+
+
+def _index(report):
+    idx = report.get("_idx")
+    return idx if idx is not None else index_report(report)
+
+
 def get_anomalies(report):
     """Return list of anomaly dicts from report."""
-    return report.get("summary", {}).get("anomalies") or []
+    return _index(report)["anomalies"]
 
 
 def get_health_score(report):
     """Return health score (int) or None."""
-    return report.get("summary", {}).get("health_score")
+    return _index(report)["summary"].get("health_score")
 
 
 def get_recommendations(report):
     """Return list of recommendation dicts."""
-    return report.get("summary", {}).get("recommendations") or []
+    return _index(report)["recommendations"]
 
 
 def get_resources(report):
     """Return resources dict (USE metrics)."""
-    return report.get("summary", {}).get("resources", {})
+    return _index(report)["summary"].get("resources", {})
 
 
 def get_metadata(report):
     """Return metadata dict."""
-    return report.get("metadata", {})
+    return _index(report)["metadata"]
 
 
 def has_anomaly(report, metric, min_severity=None):
@@ -49,54 +114,58 @@ def has_anomaly(report, metric, min_severity=None):
 
     min_severity: None (any), "warning" (warning or critical), "critical" (critical only)
     """
-    severity_rank = {"info": 0, "warning": 1, "critical": 2, "error": 3}
-    min_rank = severity_rank.get(min_severity, 0) if min_severity else 0
-
-    for a in get_anomalies(report):
-        if a.get("metric") == metric:
-            a_rank = severity_rank.get(a.get("severity", ""), 0)
-            if a_rank >= min_rank:
-                return True
-    return False
+    return _index(report)["max_rank"].get(metric, -1) >= MIN_SEVERITY_RANK[min_severity]
 
 
 def anomaly_value(report, metric):
     """Return float value of anomaly for metric, or None."""
-    for a in get_anomalies(report):
-        if a.get("metric") == metric:
-            try:
-                return float(a["value"])
-            except (KeyError, ValueError, TypeError):
-                return None
-    return None
+    matches = _index(report)["by_metric"].get(metric)
+    if not matches:
+        return None
+    try:
+        return float(matches[0]["value"])
+    except (KeyError, ValueError, TypeError):
+        return None
 
 
 def has_recommendation(report, title_substring):
     """Check if any recommendation title contains the substring (case-insensitive)."""
-    sub = title_substring.lower()
-    for rec in get_recommendations(report):
-        if sub in rec.get("title", "").lower():
-            return True
-        # Also check evidence and expected_impact
-        if sub in rec.get("evidence", "").lower():
-            return True
+    return has_any_recommendation(report, (title_substring,))
+
+
+def has_any_recommendation(report, substrings):
+    """Check if any recommendation title or evidence contains one of the substrings."""
+    subs = [s.lower() for s in substrings]
+    for title, evidence in _index(report)["recs_lc"]:
+        for sub in subs:
+            if sub in title or sub in evidence:
+                return True
     return False
 
 
+def get_anomaly_categories(report):
+    """Return the set of categories that have at least one anomaly."""
+    return _index(report)["cats"]
+
+
 def has_anomaly_category(report, category):
     """Check if report has any anomaly in the given category."""
-    for a in get_anomalies(report):
-        if a.get("category") == category:
-            return True
-    return False
+    return category in get_anomaly_categories(report)
+
+
+def first_data_value(results, key):
+    """Return data[key] from the first collector result that has it, or None."""
+    return next((
+        data[key]
+        for res in results
+        for data in (res.get("data") or {},)
+        if key in data
+    ), None)
 
 
 def count_anomaly_categories(report):
     """Count distinct anomaly categories."""
-    cats = set()
-    for a in get_anomalies(report):
-        cats.add(a.get("category"))
-    return len(cats)
+    return len(get_anomaly_categories(report))
 
 
 # =============================================================================
@@ -156,14 +225,13 @@ def check_memory_pressure(report):
     val = anomaly_value(report, "memory_utilization")
 
     # Also check raw memory data for high usage even without anomaly
-    mem_results = report.get("categories", {}).get("memory", [])
-    raw_mem_pct = None
-    for res in mem_results:
-        data = res.get("data") or {}
-        total = data.get("total_bytes", 0)
-        avail = data.get("available_bytes", 0)
-        if total > 0:
-            raw_mem_pct = (total - avail) / total * 100
+    mem_results = _index(report)["categories"].get("memory", [])
+    raw_mem_pct = next((
+        (data["total_bytes"] - data.get("available_bytes", 0)) / data["total_bytes"] * 100
+        for res in mem_results
+        for data in (res.get("data") or {},)
+        if data.get("total_bytes", 0) > 0
+    ), None)
 
     results.append((
         "memory_utilization WARNING+ OR raw > 80%",
@@ -190,19 +258,19 @@ def check_memory_pressure(report):
     return results
 
 
+DISK_FLOOD_METRICS = frozenset({"disk_utilization", "io_psi_pressure", "cpu_iowait", "disk_avg_latency"})
+
+
 def check_disk_flood(report):
     results = []
     health = get_health_score(report)
 
-    has_disk = has_anomaly(report, "disk_utilization", "warning")
-    has_io_psi = has_anomaly(report, "io_psi_pressure", "warning")
-    has_iowait = has_anomaly(report, "cpu_iowait", "warning")
-    has_disk_lat = has_anomaly(report, "disk_avg_latency", "warning")
-
+    found = _index(report)["warn_metrics"] & DISK_FLOOD_METRICS
     results.append((
         "disk_utilization WARNING+ OR io_psi OR iowait OR disk_latency",
-        has_disk or has_io_psi or has_iowait or has_disk_lat,
-        f"disk_util={has_disk}, io_psi={has_io_psi}, iowait={has_iowait}, disk_lat={has_disk_lat}"
+        bool(found),
+        f"disk_util={'disk_utilization' in found}, io_psi={'io_psi_pressure' in found}, "
+        f"iowait={'cpu_iowait' in found}, disk_lat={'disk_avg_latency' in found}"
     ))
 
     results.append((
@@ -227,12 +295,8 @@ def check_fork_storm(report):
     ))
 
     # Check context switches via CPU data
-    cpu_results = report.get("categories", {}).get("cpu", [])
-    ctx_switches = None
-    for res in cpu_results:
-        data = res.get("data") or {}
-        if "context_switches_per_sec" in data:
-            ctx_switches = data["context_switches_per_sec"]
+    cpu_results = _index(report)["categories"].get("cpu", [])
+    ctx_switches = first_data_value(cpu_results, "context_switches_per_sec")
 
     # Fork storm elevates context switches significantly (typically 50k-200k+)
     results.append((
@@ -242,15 +306,9 @@ def check_fork_storm(report):
     ))
 
     # Process count from process category
-    proc_results = report.get("categories", {}).get("process", [])
-    total_processes = None
-    procs_running = None
-    for res in proc_results:
-        data = res.get("data") or {}
-        if "total_processes" in data:
-            total_processes = data["total_processes"]
-        if "running" in data:
-            procs_running = data["running"]
+    proc_results = _index(report)["categories"].get("process", [])
+    total_processes = first_data_value(proc_results, "total_processes")
+    procs_running = first_data_value(proc_results, "running")
 
     results.append((
         "total_processes > 500 OR procs_running > 100 OR cpu anomaly",
@@ -317,7 +375,7 @@ def check_tcp_retrans(report):
         f"value={val}" if val else "anomaly not found"
     ))
 
-    has_rec = has_recommendation(report, "retrans") or has_recommendation(report, "tcp")
+    has_rec = has_any_recommendation(report, ("retrans", "tcp"))
     results.append((
         "retransmission recommendation",
         has_rec,
@@ -336,7 +394,7 @@ def check_combined(report):
     results.append((
         ">=2 anomaly categories",
         num_categories >= 2,
-        f"categories={num_categories}: {sorted(set(a.get('category') for a in anomalies))}"
+        f"categories={num_categories}: {sorted(get_anomaly_categories(report))}"
     ))
 
     results.append((
@@ -366,8 +424,6 @@ def check_observer_effect(report):
         f"keys={list(metadata.keys())}" if metadata else "no metadata"
     ))
 
-    # Check observer overhead field if present
-    summary = report.get("summary", {})
     health = get_health_score(report)
     results.append((
         "health_score present",
@@ -398,34 +454,33 @@ def main():
     if len(sys.argv) < 3:
         print(f"Usage: {sys.argv[0]} <report.json> <test_name>", file=sys.stderr)
         print(f"Available tests: {', '.join(sorted(TESTS.keys()))}", file=sys.stderr)
-        sys.exit(2)
+        return 2
 
     report_path = sys.argv[1]
     test_name = sys.argv[2]
 
     if not os.path.exists(report_path):
         print(f"ERROR: report not found: {report_path}", file=sys.stderr)
-        sys.exit(2)
+        return 2
 
     if test_name not in TESTS:
         print(f"ERROR: unknown test '{test_name}'. Available: {', '.join(sorted(TESTS.keys()))}", file=sys.stderr)
-        sys.exit(2)
+        return 2
 
     report = load_report(report_path)
+    idx = index_report(report, describe=True)
 
     # Print report summary
-    anomalies = get_anomalies(report)
-    health = get_health_score(report)
-    recs = get_recommendations(report)
-    print(f"--- Report summary for test '{test_name}' ---")
-    print(f"  Health score: {health}")
-    print(f"  Anomalies ({len(anomalies)}):")
-    for a in anomalies:
-        print(f"    [{a.get('severity', '?').upper():8s}] {a.get('metric', '?')}: {a.get('message', '')} (value={a.get('value', '?')})")
-    print(f"  Recommendations ({len(recs)}):")
-    for r in recs:
-        print(f"    [{r.get('priority', '?')}] {r.get('title', '?')}")
-    print()
+    lines = [
+        f"--- Report summary for test '{test_name}' ---",
+        f"  Health score: {get_health_score(report)}",
+        f"  Anomalies ({len(idx['anomalies'])}):",
+        *idx["anomaly_lines"],
+        f"  Recommendations ({len(idx['recommendations'])}):",
+        *idx["rec_lines"],
+        "",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
     # Run checks
     check_fn = TESTS[test_name]
@@ -445,8 +500,13 @@ def main():
     print()
     print(f"  Result: {passed}/{passed + failed} checks passed")
 
-    sys.exit(0 if failed == 0 else 1)
+    return 0 if failed == 0 else 1
 
 
 if __name__ == "__main__":
-    main()
+    code = main()
+    # Skip interpreter teardown (atexit handlers, final GC): these scripts
+    # run once per report in CI and exit right after printing.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)